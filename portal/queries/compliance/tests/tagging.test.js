@@ -0,0 +1,56 @@
+/**
+ * Tests for tagging.js - mandatory tag evaluation
+ * Runs the cases shared with scripts/tag_compliance.py, which precomputes the
+ * same rules at write time, so the two implementations cannot drift apart.
+ */
+
+jest.mock('../../../utils/shared', () => ({
+    mandatoryTags: require('./tag-compliance-cases.json').mandatory_tags
+}));
+
+const { processTeamsTagCompliance } = require('../tagging');
+const { mandatory_tags: mandatoryTags, cases } = require('./tag-compliance-cases.json');
+
+// Mock cursor that iterates over documents
+function createMockCursor(documents) {
+    let index = 0;
+    return {
+        [Symbol.asyncIterator]() {
+            return {
+                async next() {
+                    if (index < documents.length) {
+                        return { value: documents[index++], done: false };
+                    }
+                    return { done: true };
+                }
+            };
+        }
+    };
+}
+
+// Create mock request object
+function createMockReq() {
+    return {
+        getDetailsForAllAccounts: jest.fn().mockResolvedValue({
+            findByAccountId: (accountId) => ({
+                teams: ['team-a']
+            })
+        })
+    };
+}
+
+describe('processTeamsTagCompliance shared cases', () => {
+    test.each(cases.map(c => [c.name, c]))('%s', async (name, c) => {
+        const teamAgg = await processTeamsTagCompliance(createMockReq(), createMockCursor([c.doc]));
+
+        if (c.excluded) {
+            expect(teamAgg.size).toBe(0);
+            return;
+        }
+
+        const tagMissing = teamAgg.get('team-a').resourceTypes.get(c.doc.resource_type);
+        for (const tag of mandatoryTags) {
+            expect([tag, tagMissing.get(tag)]).toEqual([tag, c.missing.includes(tag) ? 1 : 0]);
+        }
+    });
+});
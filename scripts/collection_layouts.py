@@ -0,0 +1,112 @@
+"""
+Collection layouts for inventory snapshots
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+plain       regular collection; unique (year, month, day, account_id,
+            resource_id) index from `ensure_indexes` (the default layout)
+clustered   clustered collection keyed on a composite snapshot `_id`
+            {year, month, day, account_id, resource_id}, so a date is one
+            contiguous `_id` range and uniqueness comes from the cluster key
+timeseries  time-series collection with `snapshot_at` (midnight UTC of the
+            snapshot date) as timeField and `account_id` as metaField
+
+Every layout keeps the top-level year/month/day/account_id/resource_id fields
+and a (year, month, day) index, so the portal's queries work unchanged; the
+`date_filter` / `latest_date` helpers give each layout's native equivalent.
+"""
+
+import datetime as dt
+from datetime import timezone
+from typing import Dict, Optional
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+LAYOUTS = ("plain", "clustered", "timeseries")
+
+SNAPSHOT_KEY_FIELDS = ("year", "month", "day", "account_id", "resource_id")
+TIME_FIELD = "snapshot_at"
+META_FIELD = "account_id"
+
+def snapshot_at(y: int, m: int, d: int) -> dt.datetime:
+    return dt.datetime(y, m, d, tzinfo=timezone.utc)
+
+def existing_layout(info: Dict) -> str:
+    """Layout of an existing collection, from its `listCollections` entry."""
+    options = info.get("options", {})
+    if info.get("type") == "timeseries" or "timeseries" in options:
+        return "timeseries"
+    if options.get("clusteredIndex"):
+        return "clustered"
+    return "plain"
+
+def check_layout(info: Dict, layout: str):
+    coll_name = info["name"]
+    found = existing_layout(info)
+    if found != layout:
+        raise ValueError(f"{coll_name} already exists as a {found} collection, not {layout}; drop it or use --layout {found}")
+    if layout == "timeseries":
+        ts = info.get("options", {}).get("timeseries", {})
+        if ts.get("timeField") != TIME_FIELD or ts.get("metaField") != META_FIELD:
+            raise ValueError(f"{coll_name} is a time-series collection on timeField={ts.get('timeField')!r}, "
+                             f"metaField={ts.get('metaField')!r}; expected {TIME_FIELD!r}, {META_FIELD!r}")
+
+def create_layout_collection(db, coll_name: str, layout: str):
+    """Create `coll_name` with the given layout; an existing collection must already have it."""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout: {layout}")
+    info = next(iter(db.list_collections(filter={"name": coll_name})), None)
+    if info is None and layout != "plain":
+        try:
+            if layout == "clustered":
+                db.create_collection(coll_name, clusteredIndex={"key": {"_id": 1}, "unique": True})
+            else:
+                db.create_collection(coll_name, timeseries={
+                    "timeField": TIME_FIELD, "metaField": META_FIELD, "granularity": "hours",
+                })
+        except CollectionInvalid:
+            # Created concurrently; check what won
+            info = next(iter(db.list_collections(filter={"name": coll_name})), None)
+    if info is not None:
+        check_layout(info, layout)
+
+def ensure_layout_indexes(coll, layout: str):
+    """Secondary indexes for clustered / time-series layouts (plain uses `ensure_indexes`)."""
+    try:
+        coll.create_index([("year", ASCENDING), ("month", ASCENDING), ("day", ASCENDING)])
+        coll.create_index("resource_type")
+        if layout == "clustered":
+            coll.create_index("account_id")
+        elif layout == "timeseries":
+            coll.create_index([(META_FIELD, ASCENDING), (TIME_FIELD, ASCENDING)])
+    except OperationFailure as e:
+        print(f"[WARN] Index creation failed for {coll.name}: {e}")
+
+def adapt_doc(doc: Dict, layout: str) -> Dict:
+    """Shallow copy of a seeder document shaped for `layout`."""
+    out = dict(doc)
+    if layout == "clustered":
+        out["_id"] = {k: doc[k] for k in SNAPSHOT_KEY_FIELDS}
+    elif layout == "timeseries":
+        out[TIME_FIELD] = snapshot_at(doc["year"], doc["month"], doc["day"])
+    return out
+
+def date_filter(layout: str, y: int, m: int, d: int) -> Dict:
+    """Native filter for one snapshot date."""
+    if layout == "clustered":
+        # Embedded documents compare field by field, so {y, m, d} sorts before
+        # every {y, m, d, account_id, resource_id} key of that date
+        return {"_id": {"$gte": {"year": y, "month": m, "day": d}, "$lt": {"year": y, "month": m, "day": d + 1}}}
+    if layout == "timeseries":
+        return {TIME_FIELD: snapshot_at(y, m, d)}
+    return {"year": y, "month": m, "day": d}
+
+def latest_date(coll, layout: str) -> Optional[Dict]:
+    """Native latest-date lookup, returning {year, month, day} like the portal's findOne."""
+    projection = {"year": 1, "month": 1, "day": 1}
+    if layout == "clustered":
+        return coll.find_one({}, projection=projection, sort=[("_id", DESCENDING)])
+    if layout == "timeseries":
+        return coll.find_one({}, projection=projection, sort=[(TIME_FIELD, DESCENDING)])
+    return coll.find_one({}, projection=projection,
+                         sort=[("year", DESCENDING), ("month", DESCENDING), ("day", DESCENDING)])
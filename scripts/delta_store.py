@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Delta snapshot storage → keyframes + changed documents + tombstones
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+The default layout stores a full copy of every resource per year/month/day.
+In delta layout (a separate database, same collection names):
+
+- Every `--keyframe-every` days a collection stores a full *keyframe*.
+- Other days store only documents that were added or changed since the
+  previous day, plus *tombstones* (`deleted: true`, keys only) for resources
+  that disappeared.
+- Each stored document carries `snapshot_kind` ("keyframe" | "delta") and a
+  `content_hash` of everything except its date and `_id`.
+- `snapshot_manifest` has one entry per (collection, date) with its kind, the
+  keyframe it builds on and document / tombstone counts.
+
+Materialising date D reads D's chain newest-first (D, D-1, …, keyframe) from
+the normal (year, month, day, account_id, resource_id) index and keeps the
+first version seen of each resource, so the result has the same shape as the
+full layout (year/month/day = D, snapshot fields stripped).
+
+The seeder writes this layout with `--storage delta`. This script also:
+
+  convert      copy a full-snapshot database into delta layout
+  materialise  write date D back out as a full snapshot (e.g. for the portal)
+  compare      storage size and per-date scan latency, full vs delta
+
+Usage:
+  python delta_store.py convert --source-db aws_data --target-db aws_data_delta --keyframe-every 7
+  python delta_store.py materialise --db aws_data_delta --date 2025-08-13 --target-db aws_data_0813
+  python delta_store.py compare --full-db aws_data --delta-db aws_data_delta --repeat 5
+"""
+
+import argparse
+import datetime as dt
+import hashlib
+import statistics
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import bson
+from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from mock_aws_to_mongo import ensure_indexes
+from tag_compliance import ensure_tag_compliance_indexes
+
+COLLECTIONS = [
+    "autoscaling_groups", "ec2", "efs_filesystems", "elb_classic", "elb_v2",
+    "elb_v2_certificates", "elb_v2_listeners", "kms_key_metadata", "kms_keys",
+    "rds", "redshift_clusters", "route53_zones", "s3_buckets", "security_groups",
+    "tags", "volumes",
+]
+
+MANIFEST = "snapshot_manifest"
+SNAPSHOT_FIELDS = ("snapshot_kind", "content_hash", "deleted")
+UNHASHED_FIELDS = ("_id", "year", "month", "day") + SNAPSHOT_FIELDS
+
+Key = Tuple[str, str]
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ──────────────────────────────────────────────────────────────────────────────
+
+def date_key(y: int, m: int, d: int) -> int:
+    return y * 10000 + m * 100 + d
+
+def split_date_key(key: int) -> Tuple[int, int, int]:
+    return key // 10000, key // 100 % 100, key % 100
+
+def parse_date(value: str) -> int:
+    y, m, d = map(int, value.split("-"))
+    return date_key(y, m, d)
+
+def format_date(key: int) -> str:
+    y, m, d = split_date_key(key)
+    return f"{y:04d}-{m:02d}-{d:02d}"
+
+def days_between(a: int, b: int) -> int:
+    return (dt.date(*split_date_key(b)) - dt.date(*split_date_key(a))).days
+
+def content_hash(doc: Dict) -> str:
+    core = {k: v for k, v in doc.items() if k not in UNHASHED_FIELDS}
+    return hashlib.blake2b(bson.encode(core), digest_size=16).hexdigest()
+
+def ensure_delta_indexes(db, coll_name: str):
+    ensure_indexes(db[coll_name])
+    if coll_name == "tags":
+        ensure_tag_compliance_indexes(db[coll_name])
+    try:
+        db[MANIFEST].create_index([("collection", ASCENDING), ("date", ASCENDING)], unique=True)
+    except OperationFailure as e:
+        print(f"[WARN] Index creation failed for {MANIFEST}: {e}")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Read path
+# ──────────────────────────────────────────────────────────────────────────────
+
+def manifest_entry(db, coll_name: str, key: int) -> Optional[Dict]:
+    return db[MANIFEST].find_one({"collection": coll_name, "date": key})
+
+def latest_manifest_entry(db, coll_name: str) -> Optional[Dict]:
+    return db[MANIFEST].find_one({"collection": coll_name}, sort=[("date", DESCENDING)])
+
+def chain_dates(db, coll_name: str, key: int) -> List[int]:
+    """Stored dates needed to rebuild `key`, newest first (empty if `key` isn't stored)."""
+    entry = manifest_entry(db, coll_name, key)
+    if not entry:
+        return []
+    cursor = db[MANIFEST].find(
+        {"collection": coll_name, "date": {"$gte": entry["keyframe"], "$lte": key}},
+        projection={"date": 1}, sort=[("date", DESCENDING)],
+    )
+    return [e["date"] for e in cursor]
+
+def materialise(db, coll_name: str, key: int, query: Optional[Dict] = None,
+                projection: Optional[Dict] = None, include_hash: bool = False) -> Iterator[Dict]:
+    """Yield date `key` of `coll_name` as full-layout documents."""
+    y, m, d = split_date_key(key)
+    if projection is not None:
+        projection = {**projection, "account_id": 1, "resource_id": 1, "deleted": 1, "content_hash": 1}
+
+    seen: Set[Key] = set()
+    for stored in chain_dates(db, coll_name, key):
+        sy, sm, sd = split_date_key(stored)
+        for doc in db[coll_name].find({**(query or {}), "year": sy, "month": sm, "day": sd}, projection=projection):
+            k = (doc.get("account_id"), doc.get("resource_id"))
+            if k in seen:
+                continue
+            seen.add(k)
+            if doc.get("deleted"):
+                continue
+            h = doc.get("content_hash")
+            for f in SNAPSHOT_FIELDS:
+                doc.pop(f, None)
+            doc.update({"year": y, "month": m, "day": d})
+            if include_hash:
+                doc["content_hash"] = h
+            yield doc
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Write path
+# ──────────────────────────────────────────────────────────────────────────────
+
+class DeltaWriter:
+    """Write one collection's snapshot for one date in delta layout.
+
+    Call `write()` with any number of document batches (e.g. one per account),
+    then `close()` to tombstone resources of accounts that were not written
+    and record the manifest entry. Dates must be written in ascending order.
+    """
+
+    def __init__(self, db, coll_name: str, key: int, keyframe_every: int):
+        self.db = db
+        self.coll = db[coll_name]
+        self.coll_name = coll_name
+        self.key = key
+        self.year, self.month, self.day = split_date_key(key)
+
+        latest = latest_manifest_entry(db, coll_name)
+        if latest and latest["date"] >= key:
+            raise ValueError(f"{coll_name}: {format_date(key)} is not after the latest stored date {format_date(latest['date'])}")
+        self.prev = latest["date"] if latest else None
+        if latest is None or days_between(latest["keyframe"], key) >= keyframe_every:
+            self.kind, self.keyframe = "keyframe", key
+        else:
+            self.kind, self.keyframe = "delta", latest["keyframe"]
+
+        self.accounts_written: Set[str] = set()
+        self._prev_hashes: Optional[Dict[str, Dict[str, str]]] = None
+        self.docs = 0
+        self.tombstones = 0
+        ensure_delta_indexes(db, coll_name)
+
+    def previous_hashes(self) -> Dict[str, Dict[str, str]]:
+        """account_id → {resource_id: content_hash} of the previous date, materialised once."""
+        if self._prev_hashes is None:
+            self._prev_hashes = {}
+            if self.prev is not None:
+                for doc in materialise(self.db, self.coll_name, self.prev,
+                                       projection={"content_hash": 1}, include_hash=True):
+                    self._prev_hashes.setdefault(doc["account_id"], {})[doc["resource_id"]] = doc["content_hash"]
+        return self._prev_hashes
+
+    def previous_accounts(self) -> Set[str]:
+        """Accounts with documents anywhere in the previous date's chain (distinct on the index)."""
+        accounts: Set[str] = set()
+        for stored in chain_dates(self.db, self.coll_name, self.prev):
+            y, m, d = split_date_key(stored)
+            accounts.update(self.coll.distinct("account_id", {"year": y, "month": m, "day": d}))
+        return accounts
+
+    def previous_keys(self, accounts: Set[str]) -> List[Key]:
+        if self._prev_hashes is not None:
+            return [(a, rid) for a in sorted(accounts) for rid in self._prev_hashes.get(a, {})]
+        return [
+            (doc["account_id"], doc["resource_id"])
+            for doc in materialise(self.db, self.coll_name, self.prev,
+                                   {"account_id": {"$in": sorted(accounts)}}, projection={})
+        ]
+
+    def tombstone(self, account_id: str, resource_id: str) -> Dict:
+        return {
+            "year": self.year, "month": self.month, "day": self.day,
+            "account_id": account_id, "resource_id": resource_id,
+            "snapshot_kind": self.kind, "deleted": True,
+        }
+
+    def write(self, docs: List[Dict]):
+        out = []
+        by_account: Dict[str, List[Dict]] = {}
+        for doc in docs:
+            by_account.setdefault(doc["account_id"], []).append(doc)
+
+        for account_id, acct_docs in by_account.items():
+            prev = {} if self.kind == "keyframe" else self.previous_hashes().get(account_id, {})
+            current = set()
+            for doc in acct_docs:
+                h = content_hash(doc)
+                current.add(doc["resource_id"])
+                if self.kind == "delta" and prev.get(doc["resource_id"]) == h:
+                    continue
+                stored = {k2: v for k2, v in doc.items() if k2 != "_id"}
+                stored.update({"year": self.year, "month": self.month, "day": self.day,
+                               "snapshot_kind": self.kind, "content_hash": h})
+                out.append(stored)
+            for resource_id in prev.keys() - current:
+                out.append(self.tombstone(account_id, resource_id))
+                self.tombstones += 1
+            self.accounts_written.add(account_id)
+
+        if out:
+            self.coll.insert_many(out, ordered=False)
+            self.docs += len(out)
+
+    def close(self):
+        if self.kind == "delta":
+            missing = self.previous_accounts() - self.accounts_written
+            gone = self.previous_keys(missing) if missing else []
+            if gone:
+                self.coll.insert_many([self.tombstone(*k) for k in gone], ordered=False)
+                self.tombstones += len(gone)
+                self.docs += len(gone)
+
+        self.db[MANIFEST].update_one(
+            {"collection": self.coll_name, "date": self.key},
+            {"$set": {
+                "year": self.year, "month": self.month, "day": self.day,
+                "kind": self.kind, "keyframe": self.keyframe,
+                "docs": self.docs, "tombstones": self.tombstones,
+            }},
+            upsert=True,
+        )
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Commands
+# ──────────────────────────────────────────────────────────────────────────────
+
+def source_dates(db, coll_name: str) -> List[int]:
+    pipeline = [{"$group": {"_id": {"year": "$year", "month": "$month", "day": "$day"}}}]
+    return sorted(date_key(p["_id"]["year"], p["_id"]["month"], p["_id"]["day"]) for p in db[coll_name].aggregate(pipeline))
+
+def convert_collection(src, dst, coll_name: str, keyframe_every: int) -> Tuple[int, int]:
+    latest = latest_manifest_entry(dst, coll_name)
+    read = written = 0
+    for key in source_dates(src, coll_name):
+        if latest and key <= latest["date"]:
+            continue
+        y, m, d = split_date_key(key)
+        writer = DeltaWriter(dst, coll_name, key, keyframe_every)
+        for account_id in src[coll_name].distinct("account_id", {"year": y, "month": m, "day": d}):
+            docs = list(src[coll_name].find({"year": y, "month": m, "day": d, "account_id": account_id}))
+            read += len(docs)
+            writer.write(docs)
+        writer.close()
+        written += writer.docs
+        print(f"[{format_date(key)}] {coll_name:22s} {writer.kind:8s} stored {writer.docs:6d} ({writer.tombstones} tombstones)")
+    return read, written
+
+def cmd_convert(args):
+    client = MongoClient(args.mongo_uri)
+    src, dst = client[args.source_db], client[args.target_db]
+    read = written = 0
+    for coll_name in args.collections:
+        r, w = convert_collection(src, dst, coll_name, args.keyframe_every)
+        read += r
+        written += w
+    ratio = written / read if read else 0
+    print(f"✔ Converted {read} full-layout docs → {written} delta-layout docs ({ratio:.1%}).")
+
+def cmd_materialise(args):
+    client = MongoClient(args.mongo_uri)
+    db = client[args.db]
+    target = client[args.target_db] if args.target_db else None
+    key = parse_date(args.date)
+    for coll_name in args.collections:
+        started = time.perf_counter()
+        n = 0
+        batch: List[Dict] = []
+        if target is not None:
+            ensure_indexes(target[coll_name])
+        for doc in materialise(db, coll_name, key):
+            n += 1
+            if target is not None:
+                doc.pop("_id", None)
+                batch.append(doc)
+                if len(batch) >= args.batch_size:
+                    target[coll_name].insert_many(batch, ordered=False)
+                    batch = []
+        if batch:
+            target[coll_name].insert_many(batch, ordered=False)
+        ms = (time.perf_counter() - started) * 1000
+        print(f"[{args.date}] Materialised {n:6d} → {coll_name} in {ms:.1f} ms")
+
+def storage_stats(db, coll_names: List[str]) -> Dict[str, int]:
+    totals = {"docs": 0, "size": 0, "storageSize": 0, "totalIndexSize": 0}
+    existing = set(db.list_collection_names())
+    for coll_name in coll_names:
+        if coll_name not in existing:
+            continue
+        stats = db.command("collStats", coll_name)
+        totals["docs"] += stats.get("count", 0)
+        for k in ("size", "storageSize", "totalIndexSize"):
+            totals[k] += stats.get(k, 0)
+    return totals
+
+def timed_median(fn, repeat: int) -> Tuple[float, int]:
+    times, n = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        n = fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), n
+
+def cmd_compare(args):
+    client = MongoClient(args.mongo_uri)
+    full, delta = client[args.full_db], client[args.delta_db]
+
+    print("Storage (bytes):")
+    print(f"  {'layout':8s} {'docs':>10s} {'size':>14s} {'storage':>14s} {'indexes':>14s}")
+    for label, db, names in (("full", full, args.collections), ("delta", delta, args.collections + [MANIFEST])):
+        s = storage_stats(db, names)
+        print(f"  {label:8s} {s['docs']:10d} {s['size']:14d} {s['storageSize']:14d} {s['totalIndexSize']:14d}")
+
+    dates = [parse_date(d) for d in args.date]
+    print(f"\nPer-date scan latency (median of {args.repeat}, ms):")
+    print(f"  {'date':10s} {'collection':22s} {'docs':>7s} {'full':>9s} {'delta':>9s} {'chain':>6s}")
+    for coll_name in args.collections:
+        coll_dates = dates
+        if not coll_dates:
+            latest = latest_manifest_entry(delta, coll_name)
+            coll_dates = [latest["date"]] if latest else []
+        for key in coll_dates:
+            y, m, d = split_date_key(key)
+            full_ms, full_n = timed_median(lambda: sum(1 for _ in full[coll_name].find({"year": y, "month": m, "day": d})), args.repeat)
+            delta_ms, delta_n = timed_median(lambda: sum(1 for _ in materialise(delta, coll_name, key)), args.repeat)
+            chain = len(chain_dates(delta, coll_name, key))
+            print(f"  {format_date(key):10s} {coll_name:22s} {full_n:7d} {full_ms:9.2f} {delta_ms:9.2f} {chain:6d}")
+            if full_n != delta_n:
+                print(f"  [WARN] {coll_name} {format_date(key)}: full has {full_n} docs, delta materialises {delta_n}")
+
+    print("\nLatest-date lookup (median, ms):")
+    for coll_name in args.collections:
+        full_ms, _ = timed_median(lambda: full[coll_name].find_one(
+            {}, projection={"year": 1, "month": 1, "day": 1},
+            sort=[("year", DESCENDING), ("month", DESCENDING), ("day", DESCENDING)]) and 1, args.repeat)
+        delta_ms, _ = timed_median(lambda: latest_manifest_entry(delta, coll_name) and 1, args.repeat)
+        print(f"  {coll_name:22s} full {full_ms:7.2f}  delta {delta_ms:7.2f}")
+
+    print("✔ Comparison complete.")
+
+def main():
+    ap = argparse.ArgumentParser(description="Delta snapshot storage: convert, materialise and compare against full snapshots.")
+    ap.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    ap.add_argument("--collections", default=",".join(COLLECTIONS), help="Comma-separated collections (default: all 16)")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("convert", help="Copy a full-snapshot database into delta layout (resumes after the latest stored date)")
+    p.add_argument("--source-db", default="aws_data")
+    p.add_argument("--target-db", required=True)
+    p.add_argument("--keyframe-every", type=int, default=7, help="Days between full keyframes (default: 7)")
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser("materialise", help="Rebuild one date as full-layout documents")
+    p.add_argument("--db", required=True)
+    p.add_argument("--date", required=True, help="YYYY-MM-DD")
+    p.add_argument("--target-db", default=None, help="Write the materialised snapshot here (default: only time the read)")
+    p.add_argument("--batch-size", type=int, default=1000)
+    p.set_defaults(func=cmd_materialise)
+
+    p = sub.add_parser("compare", help="Storage size and query latency, full vs delta layout")
+    p.add_argument("--full-db", default="aws_data")
+    p.add_argument("--delta-db", required=True)
+    p.add_argument("--date", action="append", default=[], help="YYYY-MM-DD; repeatable (default: latest stored date per collection)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=cmd_compare)
+
+    args = ap.parse_args()
+    args.collections = [c.strip() for c in args.collections.split(",") if c.strip()]
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
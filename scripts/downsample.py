@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Stratified downsampling → small, representative copy of a large dataset
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Copies selected dates from a source database into a target database at a
+given `--fraction`, keeping the per-account and per-resource-type shape the
+team and tenant pages depend on:
+
+- Sampling is deterministic: each resource is ranked by a salted hash of its
+  `resource_id`, so the same resources are picked on every date and on every
+  run with the same `--salt`.
+- Sampling is stratified by (`account_id`, `resource_type`): each stratum of
+  n resources keeps its max(`--min-per-stratum`, round(fraction × n))
+  lowest-hash resources, so small accounts and rare types survive.
+- Cross-collection consistency is preserved:
+    kms_key_metadata     follows the sampled kms_keys (same resource_id)
+    elb_v2_listeners     follow the sampled elb_v2 load balancers
+    elb_v2_certificates  follow the certificates of the copied listeners
+    tags                 follow every sampled resource; tags for resources
+                         not present in any collection are hash-sampled
+
+Work is split into (date, account) units processed by `--workers` threads.
+Each unit first reads only `resource_id`/`resource_type`, decides the sample,
+then streams the chosen documents with server-side `$in` filters and writes
+them to the target with unordered bulk inserts.
+
+Usage:
+  python downsample.py \
+    --source-uri "mongodb://prod-replica:27017/" --source-db aws_data \
+    --target-uri "mongodb://localhost:27017/" --target-db aws_data_1pct \
+    --date 2025-08-12 --date 2025-08-13 \
+    --fraction 0.01 --workers 8 --drop-target
+"""
+
+import argparse
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from pymongo import MongoClient, DESCENDING
+
+from mock_aws_to_mongo import ensure_indexes
+from tag_compliance import ensure_tag_compliance_indexes
+
+# Collections sampled directly, stratified by (account_id, resource_type)
+PRIMARY_COLLECTIONS = [
+    "ec2", "volumes", "autoscaling_groups", "elb_classic", "elb_v2",
+    "efs_filesystems", "kms_keys", "rds", "redshift_clusters",
+    "route53_zones", "s3_buckets", "security_groups",
+]
+
+# Collections whose documents follow a sampled parent
+DEPENDENT_COLLECTIONS = ["kms_key_metadata", "elb_v2_listeners", "elb_v2_certificates", "tags"]
+
+LISTENER_LB_FIELD = "Configuration.configuration.LoadBalancerArn"
+
+Partition = Tuple[int, int, int]
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Sampling
+# ──────────────────────────────────────────────────────────────────────────────
+
+def resource_hash(resource_id: str, salt: str) -> float:
+    """Stable hash of a resource_id in [0, 1)."""
+    digest = hashlib.blake2b(f"{salt}:{resource_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+def select_stratum(resource_ids: Iterable[str], fraction: float, min_per_stratum: int, salt: str) -> List[str]:
+    ranked = sorted(set(resource_ids), key=lambda rid: resource_hash(rid, salt))
+    k = min(len(ranked), max(min_per_stratum, round(fraction * len(ranked))))
+    return ranked[:k]
+
+def listener_cert_arns(listener: Dict) -> List[str]:
+    certs = ((listener.get("Configuration") or {}).get("configuration") or {}).get("Certificates") or []
+    return [c["CertificateArn"] for c in certs if c.get("CertificateArn")]
+
+def chunks(seq: List, n: int):
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Copying
+# ──────────────────────────────────────────────────────────────────────────────
+
+class Downsampler:
+    def __init__(self, src_db, dst_db, args):
+        self.src = src_db
+        self.dst = dst_db
+        self.fraction = args.fraction
+        self.min_per_stratum = args.min_per_stratum
+        self.salt = args.salt
+        self.batch_size = args.batch_size
+
+    def copy(self, coll_name: str, query: Dict, ids_field: str, ids: List[str],
+             on_doc: Optional[Callable[[Dict], None]] = None) -> int:
+        """Stream documents whose `ids_field` is in `ids` into the target; return how many were copied."""
+        copied = 0
+        for chunk in chunks(ids, self.batch_size):
+            docs = list(self.src[coll_name].find({**query, ids_field: {"$in": chunk}}))
+            if docs:
+                self.dst[coll_name].insert_many(docs, ordered=False)
+                copied += len(docs)
+                if on_doc:
+                    for doc in docs:
+                        on_doc(doc)
+        return copied
+
+    def sample_account(self, part: Partition, account_id: str) -> Dict[str, int]:
+        y, m, d = part
+        base = {"year": y, "month": m, "day": d, "account_id": account_id}
+        counts: Dict[str, int] = {}
+        all_ids: Set[str] = set()
+        sampled: Dict[str, List[str]] = {}
+
+        # Primaries: decide on (resource_id, resource_type) only, then fetch
+        for coll_name in PRIMARY_COLLECTIONS:
+            strata: Dict[str, List[str]] = {}
+            for doc in self.src[coll_name].find(base, projection={"_id": 0, "resource_id": 1, "resource_type": 1}):
+                strata.setdefault(doc.get("resource_type") or "Unknown", []).append(doc["resource_id"])
+                all_ids.add(doc["resource_id"])
+            keep = []
+            for ids in strata.values():
+                keep.extend(select_stratum(ids, self.fraction, self.min_per_stratum, self.salt))
+            sampled[coll_name] = keep
+            counts[coll_name] = self.copy(coll_name, base, "resource_id", keep)
+
+        # KMS metadata shares resource_id with kms_keys
+        keys = sampled.get("kms_keys", [])
+        counts["kms_key_metadata"] = self.copy("kms_key_metadata", base, "resource_id", keys)
+
+        # Listeners follow their load balancer, certificates follow listeners
+        lbs = sampled.get("elb_v2", [])
+        cert_arns: Set[str] = set()
+        counts["elb_v2_listeners"] = self.copy("elb_v2_listeners", base, LISTENER_LB_FIELD, lbs,
+                                               on_doc=lambda lst: cert_arns.update(listener_cert_arns(lst)))
+        counts["elb_v2_certificates"] = self.copy("elb_v2_certificates", base, "resource_id", sorted(cert_arns))
+
+        # Tags follow sampled resources; orphan tags are hash-sampled
+        kept_ids = {rid for ids in sampled.values() for rid in ids}
+        tag_ids = [
+            doc["resource_id"]
+            for doc in self.src["tags"].find(base, projection={"_id": 0, "resource_id": 1})
+            if doc["resource_id"] in kept_ids
+            or (doc["resource_id"] not in all_ids and resource_hash(doc["resource_id"], self.salt) < self.fraction)
+        ]
+        counts["tags"] = self.copy("tags", base, "resource_id", tag_ids)
+        return counts
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Main
+# ──────────────────────────────────────────────────────────────────────────────
+
+def parse_date(value: str) -> Partition:
+    y, m, d = map(int, value.split("-"))
+    return y, m, d
+
+def latest_partition(db) -> Optional[Partition]:
+    latest = None
+    for coll_name in PRIMARY_COLLECTIONS + DEPENDENT_COLLECTIONS:
+        doc = db[coll_name].find_one({}, projection={"year": 1, "month": 1, "day": 1},
+                                     sort=[("year", DESCENDING), ("month", DESCENDING), ("day", DESCENDING)])
+        if doc and (latest is None or (doc["year"], doc["month"], doc["day"]) > latest):
+            latest = (doc["year"], doc["month"], doc["day"])
+    return latest
+
+def accounts_for(db, part: Partition) -> List[str]:
+    y, m, d = part
+    query = {"year": y, "month": m, "day": d}
+    accounts: Set[str] = set()
+    for coll_name in PRIMARY_COLLECTIONS + DEPENDENT_COLLECTIONS:
+        accounts.update(a for a in db[coll_name].distinct("account_id", query) if a)
+    return sorted(accounts)
+
+def main():
+    ap = argparse.ArgumentParser(description="Copy a stratified, deterministic sample of selected dates into another database.")
+    ap.add_argument("--source-uri", default="mongodb://localhost:27017/")
+    ap.add_argument("--source-db", default="aws_data")
+    ap.add_argument("--target-uri", default=None, help="Defaults to --source-uri")
+    ap.add_argument("--target-db", required=True)
+    ap.add_argument("--date", action="append", default=[], help="YYYY-MM-DD to copy; repeatable (default: latest date)")
+    ap.add_argument("--fraction", type=float, default=0.01, help="Fraction of each stratum to keep (default: 0.01)")
+    ap.add_argument("--min-per-stratum", type=int, default=1, help="Resources kept per (account, type) stratum at minimum (default: 1)")
+    ap.add_argument("--salt", default="", help="Hash salt; change it to draw a different sample")
+    ap.add_argument("--workers", type=int, default=8, help="(date, account) units copied in parallel (default: 8)")
+    ap.add_argument("--batch-size", type=int, default=1000, help="resource_ids per $in filter / insert (default: 1000)")
+    ap.add_argument("--drop-target", action="store_true", help="Delete the selected dates from the target before copying (required if it has any)")
+    args = ap.parse_args()
+
+    if not 0 < args.fraction <= 1:
+        ap.error("--fraction must be in (0, 1]")
+    if args.source_uri == (args.target_uri or args.source_uri) and args.source_db == args.target_db:
+        ap.error("--target-db must differ from --source-db")
+
+    src_client = MongoClient(args.source_uri)
+    dst_client = MongoClient(args.target_uri) if args.target_uri else src_client
+    src_db, dst_db = src_client[args.source_db], dst_client[args.target_db]
+
+    if args.date:
+        partitions = [parse_date(d) for d in args.date]
+    else:
+        latest = latest_partition(src_db)
+        if latest is None:
+            print("[WARN] Source database has no dated documents; nothing to copy.")
+            return
+        partitions = [latest]
+
+    if not args.drop_target:
+        # Re-copying a date would fail partway through on duplicate keys
+        populated = sorted({
+            f"{y:04d}-{m:02d}-{d:02d}"
+            for y, m, d in partitions
+            for coll_name in PRIMARY_COLLECTIONS + DEPENDENT_COLLECTIONS
+            if dst_db[coll_name].find_one({"year": y, "month": m, "day": d}, projection={"_id": 1})
+        })
+        if populated:
+            ap.error(f"Target {args.target_db} already has documents for {', '.join(populated)}; pass --drop-target to replace them")
+
+    for coll_name in PRIMARY_COLLECTIONS + DEPENDENT_COLLECTIONS:
+        coll = dst_db[coll_name]
+        if args.drop_target:
+            for y, m, d in partitions:
+                coll.delete_many({"year": y, "month": m, "day": d})
+        ensure_indexes(coll)
+        if coll_name == "tags":
+            ensure_tag_compliance_indexes(coll)
+
+    sampler = Downsampler(src_db, dst_db, args)
+    units = [(part, acct) for part in partitions for acct in accounts_for(src_db, part)]
+    print(f"Sampling {len(units)} (date, account) unit(s) at {args.fraction:.2%} → {args.target_db}")
+
+    started = time.time()
+    totals: Dict[str, int] = {}
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {pool.submit(sampler.sample_account, part, acct): (part, acct) for part, acct in units}
+        for fut in as_completed(futures):
+            (y, m, d), acct = futures[fut]
+            counts = fut.result()
+            for k, n in counts.items():
+                totals[k] = totals.get(k, 0) + n
+            print(f"[{y:04d}-{m:02d}-{d:02d}][{acct}] Copied {sum(counts.values()):6d} docs")
+
+    print("Totals across all units:")
+    for k in sorted(totals.keys()):
+        print(f"  {k:22s} {totals[k]:6d}")
+    print(f"✔ Downsampling complete in {time.time() - started:.1f}s.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Collection layout benchmark (plain vs clustered vs time-series)
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Generates `--days` consecutive snapshot dates with the seeder, loads the same
+documents into one database per layout (`<db-prefix>_<layout>`, see
+collection_layouts.py) and reports, per layout:
+
+- load throughput (docs/s, insert time only; documents are generated once)
+- storage: collStats size, storageSize and totalIndexSize summed over the 16
+  collections
+- query latency (median of `--repeat`) over the collections the portal reads:
+    latest         the portal's findOne sorted by year/month/day desc
+    latest/native  the layout's own latest lookup (_id / snapshot_at sort)
+    scan           the portal's find({year, month, day}), cursor drained
+    scan/native    the layout's own date filter (_id range / snapshot_at)
+
+Usage:
+  python layout_bench.py \
+    --mongo-uri "mongodb://localhost:27017/" \
+    --db-prefix layout_bench --drop \
+    --date 2025-08-01 --days 7 --accounts 20 \
+    --layouts plain,clustered,timeseries --repeat 5 --json-out layouts.json
+"""
+
+import argparse
+import datetime as dt
+import json
+import random
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+from pymongo import MongoClient
+
+from collection_layouts import LAYOUTS, adapt_doc, create_layout_collection, date_filter, ensure_layout_indexes, latest_date
+from mock_aws_to_mongo import Context, add_generation_args, build_account_docs, ensure_indexes, gen_account_ids, seed_account_rng
+from tag_compliance import ensure_tag_compliance_indexes, parse_mandatory_tags
+from workload_sim import DATE_PROJECTION, DATE_SORT, LATEST_COLLECTIONS
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Load
+# ──────────────────────────────────────────────────────────────────────────────
+
+def generate(args) -> Tuple[Dict[str, List[Dict]], List[dt.date]]:
+    y, m, d = map(int, args.date.split("-"))
+    dates = [dt.date(y, m, d) + dt.timedelta(days=i) for i in range(args.days)]
+    mandatory_tags = parse_mandatory_tags(args.mandatory_tags)
+    # Same accounts on every date and every run, like consecutive seeder runs with one --seed
+    random.seed(args.seed)
+    account_ids = gen_account_ids(args)
+    docs: Dict[str, List[Dict]] = {}
+    for date in dates:
+        for acct_id in account_ids:
+            seed_account_rng(args.seed, acct_id)
+            ctx = Context(region=args.region, account=acct_id, y=date.year, m=date.month, d=date.day)
+            for coll_name, coll_docs in build_account_docs(args, ctx, mandatory_tags).items():
+                docs.setdefault(coll_name, []).extend(coll_docs)
+    return docs, dates
+
+def load(db, layout: str, docs: Dict[str, List[Dict]], batch_size: int) -> Tuple[int, float]:
+    total, seconds = 0, 0.0
+    for coll_name, coll_docs in docs.items():
+        coll = db[coll_name]
+        create_layout_collection(db, coll_name, layout)
+        if layout == "plain":
+            ensure_indexes(coll)
+        else:
+            ensure_layout_indexes(coll, layout)
+        if coll_name == "tags":
+            ensure_tag_compliance_indexes(coll)
+
+        adapted = [adapt_doc(doc, layout) for doc in coll_docs]
+        started = time.perf_counter()
+        for i in range(0, len(adapted), batch_size):
+            coll.insert_many(adapted[i:i + batch_size], ordered=False)
+        seconds += time.perf_counter() - started
+        total += len(adapted)
+    return total, seconds
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Measure
+# ──────────────────────────────────────────────────────────────────────────────
+
+def storage_stats(db) -> Dict[str, int]:
+    totals = {"size": 0, "storageSize": 0, "totalIndexSize": 0}
+    for coll_name in db.list_collection_names():
+        if coll_name.startswith("system."):
+            continue
+        stats = db.command("collStats", coll_name)
+        for k in totals:
+            totals[k] += stats.get(k, 0)
+    return totals
+
+def median_ms(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+def drain(cursor) -> int:
+    return sum(1 for _ in cursor)
+
+def measure_queries(db, layout: str, dates: List[dt.date], repeat: int) -> Dict[str, float]:
+    """Median latency per query shape, summed over the portal's collections (and dates for scans)."""
+    out = {"latest": 0.0, "latest/native": 0.0, "scan": 0.0, "scan/native": 0.0}
+    for coll_name in LATEST_COLLECTIONS:
+        coll = db[coll_name]
+        out["latest"] += median_ms(lambda: coll.find_one({}, projection=DATE_PROJECTION, sort=DATE_SORT), repeat)
+        out["latest/native"] += median_ms(lambda: latest_date(coll, layout), repeat)
+        for date in dates:
+            portal_q = {"year": date.year, "month": date.month, "day": date.day}
+            native_q = date_filter(layout, date.year, date.month, date.day)
+            out["scan"] += median_ms(lambda: drain(coll.find(portal_q)), repeat)
+            out["scan/native"] += median_ms(lambda: drain(coll.find(native_q)), repeat)
+    return out
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Main
+# ──────────────────────────────────────────────────────────────────────────────
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark plain, clustered and time-series collection layouts with seeder data.")
+    ap.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    ap.add_argument("--db-prefix", default="layout_bench", help="One database per layout: <prefix>_<layout>")
+    ap.add_argument("--layouts", default=",".join(LAYOUTS), help="Comma-separated layouts (default: all)")
+    ap.add_argument("--drop", action="store_true", help="Drop the benchmark databases before loading")
+    ap.add_argument("--region", default="us-east-1")
+    ap.add_argument("--date", default="2025-08-01", help="First snapshot date, YYYY-MM-DD (default: 2025-08-01)")
+    ap.add_argument("--days", type=int, default=7, help="Consecutive snapshot dates to load (default: 7)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--accounts", type=int, default=10, help="Number of AWS accounts per date (default: 10)")
+    ap.add_argument("--account-ids", default=None, help="Comma-separated list of 12-digit AWS account IDs instead.")
+    ap.add_argument("--mandatory-tags", default=None, help="Comma-separated mandatory tags for precomputed tag compliance (default: portal defaults)")
+    ap.add_argument("--batch-size", type=int, default=1000, help="Documents per insert_many (default: 1000)")
+    ap.add_argument("--repeat", type=int, default=5, help="Repetitions per query; the median is reported (default: 5)")
+    ap.add_argument("--json-out", default=None, help="Write results as JSON to this path")
+    add_generation_args(ap)
+    args = ap.parse_args()
+
+    layouts = [x.strip() for x in args.layouts.split(",") if x.strip()]
+    for layout in layouts:
+        if layout not in LAYOUTS:
+            ap.error(f"Unknown layout: {layout}")
+
+    print(f"Generating {args.days} date(s) × {args.accounts} account(s)…")
+    docs, dates = generate(args)
+    print(f"Generated {sum(len(v) for v in docs.values())} documents")
+
+    client = MongoClient(args.mongo_uri)
+    results = {}
+    for layout in layouts:
+        db_name = f"{args.db_prefix}_{layout}"
+        if args.drop:
+            client.drop_database(db_name)
+        db = client[db_name]
+
+        n, seconds = load(db, layout, docs, args.batch_size)
+        results[layout] = {
+            "load": {"docs": n, "seconds": seconds, "docs_per_s": n / seconds if seconds else 0.0},
+            "storage": storage_stats(db),
+            "latency_ms": measure_queries(db, layout, dates, args.repeat),
+        }
+        print(f"[{layout}] Loaded {n} docs in {seconds:.2f}s → {db_name}")
+
+    print("\nLoad and storage:")
+    print(f"  {'layout':11s} {'docs/s':>10s} {'size':>14s} {'storage':>14s} {'indexes':>14s}")
+    for layout, r in results.items():
+        s = r["storage"]
+        print(f"  {layout:11s} {r['load']['docs_per_s']:10.0f} {s['size']:14d} {s['storageSize']:14d} {s['totalIndexSize']:14d}")
+
+    print(f"\nQuery latency (ms, median of {args.repeat}, summed over {len(LATEST_COLLECTIONS)} collections × {len(dates)} date(s) for scans):")
+    shapes = ["latest", "latest/native", "scan", "scan/native"]
+    print(f"  {'layout':11s} " + " ".join(f"{s:>14s}" for s in shapes))
+    for layout, r in results.items():
+        print(f"  {layout:11s} " + " ".join(f"{r['latency_ms'][s]:14.2f}" for s in shapes))
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote results → {args.json_out}")
+
+    print("✔ Layout benchmark complete.")
+
+if __name__ == "__main__":
+    main()
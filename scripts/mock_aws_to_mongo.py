@@ -20,6 +20,10 @@ NEW:
 - Support for generating N accounts (`--accounts`) or a fixed list (`--account-ids`).
 - After insert completes, prints and writes a YAML `account_mappings` block with fields:
   AccountId, Team, Tenant (Id, Name, Description), Environment
+- Tag documents carry precomputed mandatory-tag compliance fields
+  (`mandatory_tags_mask`, `mandatory_tags_missing`, `mandatory_tags_spec`)
+  evaluated against `--mandatory-tags`; see tag_compliance.py for the
+  backfill job that adds them to existing data.
 
 Usage:
   python mock_aws_to_mongo.py \
@@ -33,6 +37,26 @@ Usage:
 Or provide explicit account IDs:
   --account-ids 123456789012,234567890123
 
+Distributed seeding: each node generates a disjoint slice of the accounts
+(every n-th account from the same `gen_account_ids` list) and writes a partial
+mappings file; merging the partials yields the same `account_mappings` YAML
+and totals as a single-node run with the same `--seed`:
+  python mock_aws_to_mongo.py --seed 42 --date 2025-08-12 --accounts 200000 \
+    --shard-index 0 --shard-count 4            # on each node, index 0..3
+  python mock_aws_to_mongo.py --merge account_mappings.yaml.shard-*-of-4.json
+
+Delta storage: store only added/changed documents plus tombstones between
+periodic full keyframes (see delta_store.py for the layout and read path).
+Dates must be seeded in ascending order into a dedicated database. Resource
+timestamps are then derived from the seed instead of the wall clock, so
+unchanged resources hash the same on every date:
+  --db aws_data_delta --storage delta --keyframe-every 7
+
+Collection layouts: create collections as clustered collections keyed on a
+composite snapshot `_id`, or as time-series collections with a `snapshot_at`
+timestamp (see collection_layouts.py; compare them with layout_bench.py):
+  --layout clustered | --layout timeseries
+
 Requirements:
   pip install pymongo python-dateutil
 """
@@ -40,14 +64,18 @@ Requirements:
 import argparse
 import datetime as dt
 from datetime import timezone
+import json
 import random
 import string
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from pymongo import MongoClient, ASCENDING
 from pymongo.errors import OperationFailure
 
+from collection_layouts import LAYOUTS, adapt_doc, create_layout_collection, ensure_layout_indexes
+from tag_compliance import compute_tag_compliance, ensure_tag_compliance_indexes, parse_mandatory_tags
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────────────────────────────────────
@@ -62,8 +90,21 @@ def rand_str(n: int) -> str:
 def pick(seq):
     return random.choice(seq)
 
+# Resource timestamps (LaunchTime, CreationDate, …) default to the wall clock.
+# Delta storage needs them stable across runs and dates, or every delta is a
+# near-full copy, so `--storage delta` draws them from a per-account RNG
+# instead (separate from `random`, so resource IDs are unchanged).
+STABLE_TIMESTAMP_EPOCH = dt.datetime(2025, 1, 1, tzinfo=timezone.utc)
+stable_timestamps = False
+timestamp_rng: Optional[random.Random] = None
+
+def resource_time() -> dt.datetime:
+    if timestamp_rng is None:
+        return dt.datetime.now(timezone.utc)
+    return STABLE_TIMESTAMP_EPOCH - dt.timedelta(seconds=timestamp_rng.randrange(365 * 86400))
+
 def iso_now():
-    return dt.datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+    return resource_time().replace(microsecond=0).isoformat()
 
 def ensure_indexes(coll):
     try:
@@ -179,7 +220,7 @@ def gen_autoscaling_groups(n: int, instances: List[Dict], ctx: Context) -> List[
             "MaxSize": max(2, len(member_iids) or 2),
             "DesiredCapacity": len(member_iids) or 1,
             "AvailabilityZones": [f"{ctx.region}{z}" for z in "abc"],
-            "VPCZoneIdentifier": ",".join({f"subnet-{rand_hex(8)}" for _ in range(2)}),
+            "VPCZoneIdentifier": ",".join(sorted({f"subnet-{rand_hex(8)}" for _ in range(2)})),
             "HealthCheckType": "EC2",
             "CreatedTime": iso_now(),
             "Tags": [{"Key": "app", "Value": "web"}],
@@ -283,7 +324,7 @@ def gen_kms(n: int, ctx: Context) -> Tuple[List[Dict], List[Dict]]:
             "AWSAccountId": ctx.account,
             "KeyId": kid,
             "Arn": karn,
-            "CreationDate": dt.datetime.now(timezone.utc),
+            "CreationDate": resource_time(),
             "Enabled": True,
             "KeyUsage": "ENCRYPT_DECRYPT",
             "KeyState": "Enabled",
@@ -350,7 +391,7 @@ def gen_s3_buckets(n: int) -> List[Dict]:
     out = []
     for _ in range(n):
         name = f"{rand_str(8)}-bucket"
-        cfg = {"Name": name, "CreationDate": dt.datetime.now(timezone.utc)}
+        cfg = {"Name": name, "CreationDate": resource_time()}
         out.append(cfg)
     return out
 
@@ -536,10 +577,23 @@ def gen_account_ids(args) -> List[str]:
     if args.account_ids:
         ids = [x.strip() for x in args.account_ids.split(",") if x.strip()]
         return ids
-    out = set()
+    # Keep generation order (not set order) so every node sees the same list
+    out, seen = [], set()
     while len(out) < args.accounts:
-        out.add("".join(random.choices("0123456789", k=12)))
-    return list(out)
+        acct = "".join(random.choices("0123456789", k=12))
+        if acct not in seen:
+            seen.add(acct)
+            out.append(acct)
+    return out
+
+def seed_account_rng(seed: int, account_id: str):
+    """Per-account RNG state, so an account's data doesn't depend on which accounts came before it."""
+    random.seed(f"{seed}:{account_id}")
+    global timestamp_rng
+    timestamp_rng = random.Random(f"{seed}:{account_id}:timestamps") if stable_timestamps else None
+
+def shard_accounts(account_ids: List[str], shard_index: int, shard_count: int) -> List[Tuple[int, str]]:
+    return [(i, acct) for i, acct in enumerate(account_ids) if i % shard_count == shard_index]
 
 def build_account_mapping(owner_id: str) -> dict:
     team, service, code_prefix = random.choice(TEAM_CHOICES)
@@ -570,6 +624,58 @@ def dump_account_mappings_yaml(mappings: List[Dict]) -> str:
         lines.append(f"    Environment: \"{m['Environment']}\"")
     return "\n".join(lines)
 
+def partial_mappings_path(mappings_out: str, shard_index: int, shard_count: int) -> str:
+    return f"{mappings_out}.shard-{shard_index}-of-{shard_count}.json"
+
+def write_partial_mappings(path: str, args, indexed_mappings: List[Tuple[int, Dict]], total_counts: Dict[str, int]):
+    partial = {
+        "seed": args.seed,
+        "shard_index": args.shard_index,
+        "shard_count": args.shard_count,
+        "accounts": [{"index": i, "mapping": m} for i, m in indexed_mappings],
+        "totals": total_counts,
+    }
+    with open(path, "w") as f:
+        json.dump(partial, f, indent=2)
+
+def merge_partial_mappings(paths: List[str]) -> Tuple[List[Dict], Dict[str, int]]:
+    """Combine shard partials into (mappings in single-node order, totals)."""
+    partials = []
+    for path in paths:
+        with open(path) as f:
+            partials.append(json.load(f))
+    if not partials:
+        raise ValueError("No partial mappings files given")
+
+    seeds = {p["seed"] for p in partials}
+    counts = {p["shard_count"] for p in partials}
+    if len(seeds) != 1 or len(counts) != 1:
+        raise ValueError(f"Partials come from different runs (seeds={sorted(seeds)}, shard counts={sorted(counts)})")
+    shard_count = counts.pop()
+    indexes = sorted(p["shard_index"] for p in partials)
+    if indexes != list(range(shard_count)):
+        raise ValueError(f"Expected shards 0..{shard_count - 1}, got {indexes}")
+
+    rows = sorted((a for p in partials for a in p["accounts"]), key=lambda a: a["index"])
+    total_counts: Dict[str, int] = {}
+    for p in partials:
+        for k, n in p["totals"].items():
+            total_counts[k] = total_counts.get(k, 0) + n
+    return [a["mapping"] for a in rows], total_counts
+
+def emit_mappings_and_totals(account_mappings: List[Dict], total_counts: Dict[str, int], mappings_out: str):
+    # Emit and write YAML mappings
+    yaml_text = dump_account_mappings_yaml(account_mappings)
+    print("\n" + yaml_text + "\n")
+    with open(mappings_out, "w") as f:
+        f.write(yaml_text)
+    print(f"Wrote account mappings → {mappings_out}")
+
+    # Summary
+    print("Totals across all accounts:")
+    for k in sorted(total_counts.keys()):
+        print(f"  {k:22s} {total_counts[k]:6d}")
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Insertion
 # ──────────────────────────────────────────────────────────────────────────────
@@ -598,10 +704,10 @@ def wrap_doc(cfg: Dict, ctx: Context, coll: str) -> Dict:
         "resource_type": resource_type_from_id(rid, coll),
     }
 
-def wrap_tag_doc(mapping: Dict, ctx: Context) -> Dict:
+def wrap_tag_doc(mapping: Dict, ctx: Context, mandatory_tags: List[str]) -> Dict:
     rid = mapping["ResourceARN"]
     tags_map = {t["Key"].lower(): t["Value"] for t in mapping.get("Tags", []) if t.get("Key")}
-    return {
+    doc = {
         **mapping,
         "year": ctx.y,
         "month": ctx.m,
@@ -611,25 +717,15 @@ def wrap_tag_doc(mapping: Dict, ctx: Context) -> Dict:
         "resource_type": resource_type_from_id(rid, "tags"),
         "tags": tags_map,
     }
+    doc.update(compute_tag_compliance(doc, mandatory_tags))
+    return doc
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Main
+# Per-account generation
 # ──────────────────────────────────────────────────────────────────────────────
 
-def main():
-    ap = argparse.ArgumentParser(description="Seed Mongo with mock AWS inventory data (multi-account).")
-    ap.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
-    ap.add_argument("--db", default="aws_data")
-    ap.add_argument("--region", default="us-east-1")
-    ap.add_argument("--date", default=None, help="YYYY-MM-DD; defaults to today (UTC)")
-    ap.add_argument("--seed", type=int, default=42)
-
-    # Accounts
-    ap.add_argument("--accounts", type=int, default=1, help="Number of AWS account IDs to generate. Each account gets the same per-type counts.")
-    ap.add_argument("--account-ids", default=None, help="Comma-separated list of 12-digit AWS account IDs to use instead of random generation.")
-    ap.add_argument("--mappings-out", default="account_mappings.yaml", help="Where to write the YAML account mappings.")
-    ap.add_argument("--teams", type=int, default=10, help="Number of team variations to use (default: 10, max: unlimited with number suffixes)")
-
+def add_generation_args(ap: argparse.ArgumentParser):
+    """Resource-count options shared by the seeder and the tools built on it."""
     # Random mode
     ap.add_argument("--random", action="store_true", help="Generate random number of resources (1 to max specified) for each type")
 
@@ -647,12 +743,124 @@ def main():
     ap.add_argument("--sg", type=int, default=35, help="Max Security Groups (default: 35)")
     ap.add_argument("--volumes", type=int, default=60, help="Max EBS volumes (default: 60)")
 
+def resource_count(args, max_count: int) -> int:
+    return random.randint(1, max_count) if args.random else max_count
+
+def build_account_docs(args, ctx: Context, mandatory_tags: List[str]) -> Dict[str, List[Dict]]:
+    """Generate and wrap one account's documents, keyed by collection in insert order."""
+    # Determine resource counts (random or fixed)
+    ec2_count = resource_count(args, args.ec2)
+    volumes_count = resource_count(args, args.volumes)
+    asg_count = resource_count(args, args.asg)
+    classic_elb_count = resource_count(args, args.classic_elb)
+    elb_count = resource_count(args, args.elb)
+    efs_count = resource_count(args, args.efs)
+    kms_count = resource_count(args, args.kms)
+    rds_count = resource_count(args, args.rds)
+    redshift_count = resource_count(args, args.redshift)
+    zones_count = resource_count(args, args.zones)
+    buckets_count = resource_count(args, args.buckets)
+    sg_count = resource_count(args, args.sg)
+
+    # Generate for this account
+    ec2_cfgs = gen_ec2_instances(ec2_count, ctx)
+    vols_cfgs = gen_volumes(volumes_count, ctx)
+    asg_cfgs = gen_autoscaling_groups(asg_count, ec2_cfgs, ctx)
+    elb_classic_cfgs = gen_elb_classic(classic_elb_count, ctx)
+    elbv2_lbs, elbv2_listeners, elbv2_certs = gen_elbv2(elb_count, ctx)
+    efs_cfgs = gen_efs(efs_count, ctx)
+    kms_keys, kms_meta = gen_kms(kms_count, ctx)
+    rds_cfgs = gen_rds(rds_count, ctx)
+    red_cfgs = gen_redshift(redshift_count, ctx)
+    zones_cfgs = gen_route53_zones(zones_count)
+    bucket_cfgs = gen_s3_buckets(buckets_count)
+    sgs_cfgs = gen_security_groups(sg_count, ctx)
+
+    # Tag targets
+    tag_targets: List[str] = []
+    tag_targets += [i.get("Arn") for i in ec2_cfgs if i.get("Arn")]
+    tag_targets += [cfg.get("DBInstanceArn") for cfg in rds_cfgs]
+    tag_targets += [lb.get("LoadBalancerArn") for lb in elbv2_lbs]
+    tag_targets += [arn_route53_zone(z["Id"].split("/")[-1]) for z in zones_cfgs]
+    tag_targets += [arn_s3_bucket(b["Name"]) for b in bucket_cfgs]
+    tag_targets += [k["KeyArn"] for k in kms_keys]
+    tag_targets = [t for t in tag_targets if t]
+    tags_cfgs = gen_tags(random.sample(tag_targets, k=min(len(tag_targets), max(2, len(tag_targets)//2))))
+
+    cfgs_by_coll = [
+        ("ec2", ec2_cfgs),
+        ("volumes", vols_cfgs),
+        ("autoscaling_groups", asg_cfgs),
+        ("elb_classic", elb_classic_cfgs),
+        ("elb_v2", elbv2_lbs),
+        ("elb_v2_listeners", elbv2_listeners),
+        ("elb_v2_certificates", elbv2_certs),
+        ("efs_filesystems", efs_cfgs),
+        ("kms_keys", kms_keys),
+        ("kms_key_metadata", kms_meta),
+        ("rds", rds_cfgs),
+        ("redshift_clusters", red_cfgs),
+        ("route53_zones", zones_cfgs),
+        ("s3_buckets", bucket_cfgs),
+        ("security_groups", sgs_cfgs),
+    ]
+    docs = {coll_name: [wrap_doc(cfg, ctx, coll_name) for cfg in cfgs] for coll_name, cfgs in cfgs_by_coll}
+    docs["tags"] = [wrap_tag_doc(t, ctx, mandatory_tags) for t in tags_cfgs]
+    return docs
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Main
+# ──────────────────────────────────────────────────────────────────────────────
+
+def main():
+    ap = argparse.ArgumentParser(description="Seed Mongo with mock AWS inventory data (multi-account).")
+    ap.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    ap.add_argument("--db", default="aws_data")
+    ap.add_argument("--region", default="us-east-1")
+    ap.add_argument("--date", default=None, help="YYYY-MM-DD; defaults to today (UTC)")
+    ap.add_argument("--seed", type=int, default=42)
+
+    # Accounts
+    ap.add_argument("--accounts", type=int, default=1, help="Number of AWS account IDs to generate. Each account gets the same per-type counts.")
+    ap.add_argument("--account-ids", default=None, help="Comma-separated list of 12-digit AWS account IDs to use instead of random generation.")
+    ap.add_argument("--mappings-out", default="account_mappings.yaml", help="Where to write the YAML account mappings.")
+    ap.add_argument("--teams", type=int, default=10, help="Number of team variations to use (default: 10, max: unlimited with number suffixes)")
+    ap.add_argument("--mandatory-tags", default=None, help="Comma-separated mandatory tags for precomputed tag compliance (default: portal defaults)")
+
+    add_generation_args(ap)
+
+    # Distributed seeding
+    ap.add_argument("--shard-index", type=int, default=0, help="This node's shard (0-based); generates accounts i where i %% shard-count == shard-index")
+    ap.add_argument("--shard-count", type=int, default=1, help="Total number of shards; >1 writes a partial mappings file instead of the YAML")
+    ap.add_argument("--merge", nargs="+", default=None, metavar="PARTIAL", help="Merge shard partial mappings files into --mappings-out and exit (no Mongo access)")
+
+    # Storage layout
+    ap.add_argument("--storage", choices=["full", "delta"], default="full", help="full: every document every day; delta: changes + tombstones between keyframes")
+    ap.add_argument("--keyframe-every", type=int, default=7, help="Delta storage: days between full keyframes (default: 7)")
+    ap.add_argument("--layout", choices=LAYOUTS, default="plain", help="Collection layout: plain (default), clustered or timeseries")
+
     args = ap.parse_args()
+
+    if args.merge:
+        account_mappings, total_counts = merge_partial_mappings(args.merge)
+        emit_mappings_and_totals(account_mappings, total_counts, args.mappings_out)
+        print(f"✔ Merged {len(args.merge)} shard(s).")
+        return
+
+    if args.shard_count < 1 or not 0 <= args.shard_index < args.shard_count:
+        ap.error("--shard-index must be in [0, --shard-count)")
+    if args.storage == "delta" and args.shard_count > 1:
+        ap.error("--storage delta needs every account of a date in one run; it can't be combined with --shard-count")
+    if args.storage == "delta" and args.layout != "plain":
+        ap.error("--storage delta only supports --layout plain")
+
     random.seed(args.seed)
     
     # Initialize TEAM_CHOICES based on the --teams argument
-    global TEAM_CHOICES
+    global TEAM_CHOICES, stable_timestamps
     TEAM_CHOICES = generate_team_choices(args.teams)
+    stable_timestamps = args.storage == "delta"
+    mandatory_tags = parse_mandatory_tags(args.mandatory_tags)
 
     if args.date:
         y, m, d = map(int, args.date.split("-"))
@@ -660,117 +868,64 @@ def main():
     else:
         today = dt.datetime.now(timezone.utc).date()
         date = today
+        if args.shard_count > 1:
+            print(f"[WARN] No --date given; shards started on different days will not line up (using {date}).")
 
     client = MongoClient(args.mongo_uri)
     db = client[args.db]
 
-    # Accounts to generate
+    # Accounts to generate: every node derives the full list, then takes its slice
     account_ids = gen_account_ids(args)
-    account_mappings = []
+    indexed_mappings: List[Tuple[int, Dict]] = []
     total_counts: Dict[str, int] = {}
-
-    for acct_id in account_ids:
+    delta_writers: Dict = {}
+    prepared = set()
+    if args.storage == "delta":
+        # Imported here: delta_store builds on this module's helpers
+        from delta_store import DeltaWriter, date_key
+
+    for idx, acct_id in shard_accounts(account_ids, args.shard_index, args.shard_count):
+        seed_account_rng(args.seed, acct_id)
         ctx = Context(region=args.region, account=acct_id, y=date.year, m=date.month, d=date.day)
 
-        # Determine resource counts (random or fixed)
-        if args.random:
-            ec2_count = random.randint(1, args.ec2)
-            volumes_count = random.randint(1, args.volumes)
-            asg_count = random.randint(1, args.asg)
-            classic_elb_count = random.randint(1, args.classic_elb)
-            elb_count = random.randint(1, args.elb)
-            efs_count = random.randint(1, args.efs)
-            kms_count = random.randint(1, args.kms)
-            rds_count = random.randint(1, args.rds)
-            redshift_count = random.randint(1, args.redshift)
-            zones_count = random.randint(1, args.zones)
-            buckets_count = random.randint(1, args.buckets)
-            sg_count = random.randint(1, args.sg)
-        else:
-            ec2_count = args.ec2
-            volumes_count = args.volumes
-            asg_count = args.asg
-            classic_elb_count = args.classic_elb
-            elb_count = args.elb
-            efs_count = args.efs
-            kms_count = args.kms
-            rds_count = args.rds
-            redshift_count = args.redshift
-            zones_count = args.zones
-            buckets_count = args.buckets
-            sg_count = args.sg
-
-        # Generate for this account
-        ec2_cfgs = gen_ec2_instances(ec2_count, ctx)
-        vols_cfgs = gen_volumes(volumes_count, ctx)
-        asg_cfgs = gen_autoscaling_groups(asg_count, ec2_cfgs, ctx)
-        elb_classic_cfgs = gen_elb_classic(classic_elb_count, ctx)
-        elbv2_lbs, elbv2_listeners, elbv2_certs = gen_elbv2(elb_count, ctx)
-        efs_cfgs = gen_efs(efs_count, ctx)
-        kms_keys, kms_meta = gen_kms(kms_count, ctx)
-        rds_cfgs = gen_rds(rds_count, ctx)
-        red_cfgs = gen_redshift(redshift_count, ctx)
-        zones_cfgs = gen_route53_zones(zones_count)
-        bucket_cfgs = gen_s3_buckets(buckets_count)
-        sgs_cfgs = gen_security_groups(sg_count, ctx)
-
-        # Tag targets
-        tag_targets: List[str] = []
-        tag_targets += [i.get("Arn") for i in ec2_cfgs if i.get("Arn")]
-        tag_targets += [cfg.get("DBInstanceArn") for cfg in rds_cfgs]
-        tag_targets += [lb.get("LoadBalancerArn") for lb in elbv2_lbs]
-        tag_targets += [arn_route53_zone(z["Id"].split("/")[-1]) for z in zones_cfgs]
-        tag_targets += [arn_s3_bucket(b["Name"]) for b in bucket_cfgs]
-        tag_targets += [k["KeyArn"] for k in kms_keys]
-        tag_targets = [t for t in tag_targets if t]
-        tags_cfgs = gen_tags(random.sample(tag_targets, k=min(len(tag_targets), max(2, len(tag_targets)//2))))
-
         # Insert per-collection
-        def insert_cfgs(coll_name: str, cfgs: List[Dict]):
+        for coll_name, docs in build_account_docs(args, ctx, mandatory_tags).items():
             coll = db[coll_name]
-            docs = [wrap_doc(cfg, ctx, coll_name) for cfg in cfgs]
-            insert_many(coll, docs)
+            if args.storage == "delta":
+                if coll_name not in delta_writers:
+                    delta_writers[coll_name] = DeltaWriter(db, coll_name, date_key(date.year, date.month, date.day), args.keyframe_every)
+                delta_writers[coll_name].write(docs)
+            elif args.layout != "plain":
+                if coll_name not in prepared:
+                    create_layout_collection(db, coll_name, args.layout)
+                    ensure_layout_indexes(coll, args.layout)
+                    if coll_name == "tags":
+                        ensure_tag_compliance_indexes(coll)
+                    prepared.add(coll_name)
+                if docs:
+                    coll.insert_many([adapt_doc(doc, args.layout) for doc in docs], ordered=False)
+            else:
+                if coll_name == "tags":
+                    ensure_tag_compliance_indexes(coll)
+                insert_many(coll, docs)
             total_counts[coll_name] = total_counts.get(coll_name, 0) + len(docs)
             print(f"[{acct_id}] Inserted {len(docs):4d} → {coll_name}")
 
-        insert_cfgs("ec2", ec2_cfgs)
-        insert_cfgs("volumes", vols_cfgs)
-        insert_cfgs("autoscaling_groups", asg_cfgs)
-        insert_cfgs("elb_classic", elb_classic_cfgs)
-        insert_cfgs("elb_v2", elbv2_lbs)
-        insert_cfgs("elb_v2_listeners", elbv2_listeners)
-        insert_cfgs("elb_v2_certificates", elbv2_certs)
-        insert_cfgs("efs_filesystems", efs_cfgs)
-        insert_cfgs("kms_keys", kms_keys)
-        insert_cfgs("kms_key_metadata", kms_meta)
-        insert_cfgs("rds", rds_cfgs)
-        insert_cfgs("redshift_clusters", red_cfgs)
-        insert_cfgs("route53_zones", zones_cfgs)
-        insert_cfgs("s3_buckets", bucket_cfgs)
-        insert_cfgs("security_groups", sgs_cfgs)
-
-        # Tags
-        tag_docs = [wrap_tag_doc(t, ctx) for t in tags_cfgs]
-        coll = db["tags"]
-        ensure_indexes(coll)
-        coll.insert_many(tag_docs, ordered=False)
-        total_counts["tags"] = total_counts.get("tags", 0) + len(tag_docs)
-        print(f"[{acct_id}] Inserted {len(tag_docs):4d} → tags")
-
         # Mapping row
-        account_mappings.append(build_account_mapping(acct_id))
+        indexed_mappings.append((idx, build_account_mapping(acct_id)))
 
-    # Emit and write YAML mappings
-    yaml_text = dump_account_mappings_yaml(account_mappings)
-    print("\n" + yaml_text + "\n")
-    with open(args.mappings_out, "w") as f:
-        f.write(yaml_text)
-    print(f"Wrote account mappings → {args.mappings_out}")
+    for coll_name, writer in delta_writers.items():
+        writer.close()
+        print(f"[delta] {coll_name:22s} {writer.kind:8s} stored {writer.docs:6d} ({writer.tombstones} tombstones)")
 
-    # Summary
-    print("Totals across all accounts:")
-    for k in sorted(total_counts.keys()):
-        print(f"  {k:22s} {total_counts[k]:6d}")
+    if args.shard_count > 1:
+        path = partial_mappings_path(args.mappings_out, args.shard_index, args.shard_count)
+        write_partial_mappings(path, args, indexed_mappings, total_counts)
+        print(f"Wrote shard {args.shard_index}/{args.shard_count} partial mappings → {path}")
+        print("✔ Mock data seeding complete for this shard; run --merge with all partials.")
+        return
+
+    emit_mappings_and_totals([m for _, m in indexed_mappings], total_counts, args.mappings_out)
 
     print("✔ Mock data seeding complete.")
 
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Mandatory-tag compliance → precomputed fields on `tags` documents
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+The portal evaluates every mandatory tag (and the BSP rule) in JavaScript for
+every `tags` document on every request. This module evaluates the same rules
+once, at write time, and stores the result on the document:
+
+- `mandatory_tags_mask`     int bitmask; bit i set ⇔ mandatory tag i is missing
+                            (0 means fully compliant)
+- `mandatory_tags_missing`  list of the missing mandatory tag names
+- `mandatory_tags_spec`     comma-joined mandatory tag list the mask was
+                            computed against (bit order), so stale documents
+                            can be found after the policy changes
+- `mandatory_tags_excluded` true for documents the portal skips (buckets whose
+                            name starts with an account ID)
+
+With the indexes from `ensure_tag_compliance_indexes`, the per-account,
+per-resource-type counts of processTeamsTagCompliance (tagging.js) become
+index-covered aggregations, e.g.:
+
+    db.tags.aggregate([
+      {$match: {year: 2025, month: 8, day: 12, mandatory_tags_excluded: false}},
+      {$group: {_id: {account: "$account_id", type: "$resource_type",
+                      mask: "$mandatory_tags_mask"}, n: {$sum: 1}}}
+    ])
+
+The rules are kept in step with tagging.js by the shared cases in
+portal/queries/compliance/tests/tag-compliance-cases.json, which both
+tests/test_tag_compliance.py and the portal's jest tests run against.
+
+The seeder (`mock_aws_to_mongo.py`) annotates new tag documents directly.
+For existing data, run this module as a backfill job; it updates each
+year/month/day partition in parallel using unordered bulk writes.
+
+Usage:
+  python tag_compliance.py \
+    --mongo-uri "mongodb://localhost:27017/" \
+    --db aws_data \
+    --mandatory-tags "MyCode,Source,BSP" \
+    --workers 8 --batch-size 1000
+
+Limit to specific dates (repeatable), or recompute everything:
+  --date 2025-08-12 --date 2025-08-13
+  --force
+"""
+
+import argparse
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import MongoClient, ASCENDING, UpdateOne
+from pymongo.errors import OperationFailure
+
+# Matches the portal default in portal/utils/shared.js
+DEFAULT_MANDATORY_TAGS = ["PRCode", "Source", "SN_ServiceID", "SN_Environment", "SN_Application", "BSP"]
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Evaluation (mirrors queries/compliance/tagging.js)
+# ──────────────────────────────────────────────────────────────────────────────
+
+def parse_mandatory_tags(value: Optional[str]) -> List[str]:
+    if not value:
+        return list(DEFAULT_MANDATORY_TAGS)
+    return [x.strip() for x in value.split(",") if x.strip()]
+
+def is_missing(v) -> bool:
+    return v is None or (isinstance(v, str) and v.strip() == "")
+
+def doc_tags(doc: Dict) -> Dict:
+    """Lowercased tag dict; `Tags` array first, `tags` map as fallback."""
+    if isinstance(doc.get("Tags"), list):
+        return {t["Key"].lower(): t["Value"] for t in doc["Tags"]
+                if isinstance(t, dict) and t.get("Key") and "Value" in t}
+    if isinstance(doc.get("tags"), dict):
+        return dict(doc["tags"])
+    return {}
+
+def tag_is_missing(tag: str, tags: Dict) -> bool:
+    if tag == "BSP":
+        has_billing_id = not is_missing(tags.get("billingid"))
+        has_service = not is_missing(tags.get("service"))
+        has_project = not is_missing(tags.get("project"))
+        return not (has_billing_id and (has_service or has_project))
+    return is_missing(tags.get(tag.lower()))
+
+ACCOUNT_ID_PREFIX = re.compile(r"[0-9]{12}")
+
+def is_excluded(doc: Dict) -> bool:
+    """Buckets whose name starts with an account ID are skipped by the portal."""
+    if doc.get("resource_type") != "bucket":
+        return False
+    parts = (doc.get("resource_id") or "").split(":::")
+    return bool(ACCOUNT_ID_PREFIX.match(parts[1] if len(parts) > 1 else ""))
+
+def compute_tag_compliance(doc: Dict, mandatory_tags: List[str]) -> Dict:
+    tags = doc_tags(doc)
+    mask = 0
+    missing = []
+    for bit, tag in enumerate(mandatory_tags):
+        if tag_is_missing(tag, tags):
+            mask |= 1 << bit
+            missing.append(tag)
+    return {
+        "mandatory_tags_mask": mask,
+        "mandatory_tags_missing": missing,
+        "mandatory_tags_spec": ",".join(mandatory_tags),
+        "mandatory_tags_excluded": is_excluded(doc),
+    }
+
+def ensure_tag_compliance_indexes(coll):
+    try:
+        coll.create_index(
+            [("year", ASCENDING), ("month", ASCENDING), ("day", ASCENDING),
+             ("account_id", ASCENDING), ("resource_type", ASCENDING),
+             ("mandatory_tags_excluded", ASCENDING), ("mandatory_tags_mask", ASCENDING)]
+        )
+        coll.create_index(
+            [("year", ASCENDING), ("month", ASCENDING), ("day", ASCENDING),
+             ("mandatory_tags_missing", ASCENDING)]
+        )
+    except OperationFailure as e:
+        print(f"[WARN] Tag compliance index creation failed for {coll.name}: {e}")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Backfill
+# ──────────────────────────────────────────────────────────────────────────────
+
+Partition = Tuple[int, int, int]
+
+def list_partitions(coll) -> List[Partition]:
+    pipeline = [
+        {"$group": {"_id": {"year": "$year", "month": "$month", "day": "$day"}}},
+        {"$sort": {"_id.year": 1, "_id.month": 1, "_id.day": 1}},
+    ]
+    return [(p["_id"]["year"], p["_id"]["month"], p["_id"]["day"]) for p in coll.aggregate(pipeline)]
+
+def backfill_partition(coll, part: Partition, mandatory_tags: List[str], batch_size: int, force: bool) -> int:
+    y, m, d = part
+    query = {"year": y, "month": m, "day": d}
+    if not force:
+        query["mandatory_tags_spec"] = {"$ne": ",".join(mandatory_tags)}
+
+    updated = 0
+    ops: List[UpdateOne] = []
+    cursor = coll.find(query, projection={"Tags": 1, "tags": 1, "resource_id": 1, "resource_type": 1}, batch_size=batch_size)
+    for doc in cursor:
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": compute_tag_compliance(doc, mandatory_tags)}))
+        if len(ops) >= batch_size:
+            updated += coll.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += coll.bulk_write(ops, ordered=False).modified_count
+    return updated
+
+def main():
+    ap = argparse.ArgumentParser(description="Backfill precomputed mandatory-tag compliance fields on the tags collection.")
+    ap.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    ap.add_argument("--db", default="aws_data")
+    ap.add_argument("--collection", default="tags")
+    ap.add_argument("--mandatory-tags", default=None, help="Comma-separated mandatory tags, in bit order (default: portal defaults)")
+    ap.add_argument("--date", action="append", default=[], help="YYYY-MM-DD partition to backfill; repeatable (default: all dates)")
+    ap.add_argument("--workers", type=int, default=4, help="Partitions updated in parallel (default: 4)")
+    ap.add_argument("--batch-size", type=int, default=1000, help="Updates per bulk_write (default: 1000)")
+    ap.add_argument("--force", action="store_true", help="Recompute documents already computed against the same tag list")
+    args = ap.parse_args()
+
+    mandatory_tags = parse_mandatory_tags(args.mandatory_tags)
+    client = MongoClient(args.mongo_uri)
+    coll = client[args.db][args.collection]
+    ensure_tag_compliance_indexes(coll)
+
+    if args.date:
+        partitions = [tuple(map(int, d.split("-"))) for d in args.date]
+    else:
+        partitions = list_partitions(coll)
+
+    print(f"Backfilling {len(partitions)} partition(s) against: {', '.join(mandatory_tags)}")
+    total = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {
+            pool.submit(backfill_partition, coll, part, mandatory_tags, args.batch_size, args.force): part
+            for part in partitions
+        }
+        for fut in as_completed(futures):
+            y, m, d = futures[fut]
+            n = fut.result()
+            total += n
+            print(f"[{y:04d}-{m:02d}-{d:02d}] Updated {n:6d} → {args.collection}")
+
+    print(f"✔ Tag compliance backfill complete ({total} documents updated).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Checks compute_tag_compliance against the cases shared with the portal's
+tagging.js tests, so the two implementations of the rules cannot drift apart.
+"""
+
+import json
+import os
+
+import pytest
+
+from tag_compliance import compute_tag_compliance
+
+CASES_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "portal", "queries",
+                          "compliance", "tests", "tag-compliance-cases.json")
+
+with open(CASES_PATH) as f:
+    SHARED = json.load(f)
+
+MANDATORY_TAGS = SHARED["mandatory_tags"]
+
+@pytest.mark.parametrize("case", SHARED["cases"], ids=[c["name"] for c in SHARED["cases"]])
+def test_matches_portal_rules(case):
+    out = compute_tag_compliance(case["doc"], MANDATORY_TAGS)
+    assert out["mandatory_tags_missing"] == case["missing"]
+    assert out["mandatory_tags_excluded"] == case["excluded"]
+    expected_mask = sum(1 << i for i, tag in enumerate(MANDATORY_TAGS) if tag in case["missing"])
+    assert out["mandatory_tags_mask"] == expected_mask
+    assert out["mandatory_tags_spec"] == ",".join(MANDATORY_TAGS)
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Mixed read/write workload simulator (seeder writes vs. portal reads)
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Reproduces "ingestion writes a new day while users load dashboards":
+
+- One writer runs the seeder's insert path (`build_account_docs`) for a new
+  `--date`, inserting in `--batch-size` chunks with the chosen write concern.
+- `--readers` concurrent reader processes replay the portal's query shapes:
+    latest  findOne({}, {year,month,day}) sorted by date desc
+            (getLatest*Date in queries/compliance/*.js)
+    scan    find({year,month,day}) with the projections used by
+            queries/compliance/*.js, cursor fully drained
+    full    find({year,month,day}) with no projection, cursor fully drained
+            (the aggregate*ByTeam shapes in queries/compliance/teams.js)
+  Scans target the latest date each reader has observed, so readers switch
+  to the new day as soon as it becomes visible, like the portal does.
+
+Reads run for `--warmup` seconds before the writer starts and `--cooldown`
+seconds after it finishes, so latency is reported per phase (before / during /
+after) alongside writer throughput over time. Use `--json-out` to keep the
+results and compare index sets, batch sizes and write concerns across runs.
+
+Usage:
+  python workload_sim.py \
+    --mongo-uri "mongodb://localhost:27017/" \
+    --db aws_data \
+    --date 2025-08-13 --drop-date \
+    --accounts 50 --readers 8 \
+    --batch-size 1000 --write-concern majority \
+    --json-out run-majority-1000.json
+"""
+
+import argparse
+import datetime as dt
+from datetime import timezone
+import json
+import math
+import multiprocessing as mp
+import queue
+import random
+import time
+from typing import Dict, List, Tuple
+
+from pymongo import MongoClient, DESCENDING
+from pymongo.write_concern import WriteConcern
+
+from mock_aws_to_mongo import Context, add_generation_args, build_account_docs, ensure_indexes, gen_account_ids, seed_account_rng
+from tag_compliance import ensure_tag_compliance_indexes, parse_mandatory_tags
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Portal query shapes
+# ──────────────────────────────────────────────────────────────────────────────
+
+DATE_PROJECTION = {"year": 1, "month": 1, "day": 1}
+DATE_SORT = [("year", DESCENDING), ("month", DESCENDING), ("day", DESCENDING)]
+
+# (collection, projection) pairs used by queries/compliance/*.js
+SCAN_PROJECTIONS: List[Tuple[str, Dict]] = [
+    ("tags", {"day": 1, "account_id": 1, "resource_id": 1, "resource_type": 1, "Tags": 1, "tags": 1}),
+    ("autoscaling_groups", {"account_id": 1, "resource_id": 1, "Configuration": 1}),
+    ("elb_v2", {"account_id": 1, "resource_id": 1, "Configuration": 1}),
+    ("elb_v2_listeners", {"account_id": 1, "Configuration": 1}),
+    ("elb_classic", {"account_id": 1, "resource_id": 1, "Configuration": 1}),
+    ("rds", {"account_id": 1, "resource_id": 1, "Configuration": 1}),
+    ("redshift_clusters", {"account_id": 1, "resource_id": 1, "Configuration": 1}),
+    ("kms_keys", {"account_id": 1, "Configuration": 1}),
+]
+
+# Collections read without a projection by queries/compliance/teams.js
+FULL_SCAN_COLLECTIONS = [
+    "tags", "rds", "redshift_clusters", "elb_v2", "elb_v2_listeners",
+    "elb_classic", "kms_key_metadata", "autoscaling_groups",
+]
+
+LATEST_COLLECTIONS = sorted({c for c, _ in SCAN_PROJECTIONS} | set(FULL_SCAN_COLLECTIONS))
+
+SHAPES = ("latest", "scan", "full")
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SHAPES:
+            raise ValueError(f"Unknown query shape in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def latest_date(db, coll_name: str):
+    return db[coll_name].find_one({}, projection=DATE_PROJECTION, sort=DATE_SORT)
+
+def date_query(date_doc: Dict) -> Dict:
+    return {"year": date_doc["year"], "month": date_doc["month"], "day": date_doc["day"]}
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Readers
+# ──────────────────────────────────────────────────────────────────────────────
+
+def reader(idx: int, args, t0: float, stop, out_q):
+    """Replay portal reads until `stop` is set; ship (shape, coll, t, ms, docs) samples back."""
+    client = MongoClient(args.mongo_uri)
+    db = client[args.db]
+    rng = random.Random(args.seed + idx)
+    mix = parse_mix(args.mix)
+    shapes, weights = list(mix.keys()), list(mix.values())
+    latest: Dict[str, Dict] = {}
+    samples = []
+
+    while not stop.is_set():
+        shape = rng.choices(shapes, weights)[0]
+        if shape == "latest":
+            coll_name = rng.choice(LATEST_COLLECTIONS)
+            start = time.perf_counter()
+            doc = latest_date(db, coll_name)
+            ms = (time.perf_counter() - start) * 1000
+            n = 1 if doc else 0
+            if doc:
+                latest[coll_name] = doc
+        else:
+            if shape == "scan":
+                coll_name, projection = rng.choice(SCAN_PROJECTIONS)
+            else:
+                coll_name, projection = rng.choice(FULL_SCAN_COLLECTIONS), None
+            if coll_name not in latest:
+                doc = latest_date(db, coll_name)
+                if not doc:
+                    time.sleep(0.01)
+                    continue
+                latest[coll_name] = doc
+            start = time.perf_counter()
+            n = sum(1 for _ in db[coll_name].find(date_query(latest[coll_name]), projection=projection))
+            ms = (time.perf_counter() - start) * 1000
+        samples.append((shape, coll_name, time.time() - t0, ms, n))
+
+    out_q.put((idx, samples))
+    client.close()
+
+def collect_samples(procs, out_q, timeout: float) -> List:
+    """Gather reader samples after `stop` is set; readers that died or hang are skipped."""
+    samples = []
+    for _ in procs:
+        try:
+            _, s = out_q.get(timeout=timeout)
+        except queue.Empty:
+            print(f"[WARN] Reader did not report within {timeout:.0f}s; its samples are lost")
+            break
+        samples.extend(s)
+    for p in procs:
+        p.join(timeout=timeout)
+    return samples
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Writer
+# ──────────────────────────────────────────────────────────────────────────────
+
+def parse_write_concern(args) -> WriteConcern:
+    w = int(args.write_concern) if args.write_concern.isdigit() else args.write_concern
+    return WriteConcern(w=w, j=True if args.journal else None)
+
+def run_writer(db, args, date: dt.date, t0: float) -> List[Tuple[float, int]]:
+    """Seed `date` like the seeder does, in batches; return (t, docs) per batch."""
+    random.seed(args.seed)
+    mandatory_tags = parse_mandatory_tags(args.mandatory_tags)
+    write_concern = parse_write_concern(args)
+    indexed = set()
+    events = []
+
+    for acct_id in gen_account_ids(args):
+        seed_account_rng(args.seed, acct_id)
+        ctx = Context(region=args.region, account=acct_id, y=date.year, m=date.month, d=date.day)
+        for coll_name, docs in build_account_docs(args, ctx, mandatory_tags).items():
+            coll = db[coll_name]
+            if not args.skip_indexes and coll_name not in indexed:
+                ensure_indexes(coll)
+                if coll_name == "tags":
+                    ensure_tag_compliance_indexes(coll)
+                indexed.add(coll_name)
+            coll = coll.with_options(write_concern=write_concern)
+            for i in range(0, len(docs), args.batch_size):
+                batch = docs[i:i + args.batch_size]
+                coll.insert_many(batch, ordered=False)
+                events.append((time.time() - t0, len(batch)))
+    return events
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Reporting
+# ──────────────────────────────────────────────────────────────────────────────
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+def latency_stats(values: List[float]) -> Dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50),
+        "p90_ms": percentile(values, 90),
+        "p99_ms": percentile(values, 99),
+        "max_ms": values[-1] if values else 0.0,
+    }
+
+def phase_of(t: float, write_start: float, write_end: float) -> str:
+    if t < write_start:
+        return "before"
+    if t <= write_end:
+        return "during"
+    return "after"
+
+def summarise(samples, events, write_start: float, write_end: float, interval: float) -> Dict:
+    by_phase_shape: Dict[Tuple[str, str], List[float]] = {}
+    by_bucket: Dict[int, List[float]] = {}
+    for shape, _, t, ms, _ in samples:
+        by_phase_shape.setdefault((phase_of(t, write_start, write_end), shape), []).append(ms)
+        by_bucket.setdefault(int(t // interval), []).append(ms)
+
+    written: Dict[int, int] = {}
+    for t, n in events:
+        written[int(t // interval)] = written.get(int(t // interval), 0) + n
+
+    timeline = []
+    for b in sorted(set(by_bucket) | set(written)):
+        stats = latency_stats(by_bucket.get(b, []))
+        timeline.append({
+            "t": b * interval,
+            "reads": stats["count"],
+            "read_p50_ms": stats["p50_ms"],
+            "read_p99_ms": stats["p99_ms"],
+            "docs_written_per_s": written.get(b, 0) / interval,
+        })
+
+    total_written = sum(n for _, n in events)
+    write_secs = max(write_end - write_start, 1e-9)
+    return {
+        "latency": {f"{phase}/{shape}": latency_stats(v) for (phase, shape), v in sorted(by_phase_shape.items())},
+        "writer": {
+            "docs": total_written,
+            "seconds": write_secs,
+            "docs_per_s": total_written / write_secs,
+        },
+        "timeline": timeline,
+    }
+
+def print_summary(summary: Dict):
+    print("\nReader latency (ms):")
+    print(f"  {'phase/shape':16s} {'count':>7s} {'p50':>9s} {'p90':>9s} {'p99':>9s} {'max':>9s}")
+    for key, s in summary["latency"].items():
+        print(f"  {key:16s} {s['count']:7d} {s['p50_ms']:9.2f} {s['p90_ms']:9.2f} {s['p99_ms']:9.2f} {s['max_ms']:9.2f}")
+
+    print("\nTimeline:")
+    print(f"  {'t(s)':>7s} {'reads':>7s} {'p50':>9s} {'p99':>9s} {'docs/s':>10s}")
+    for row in summary["timeline"]:
+        print(f"  {row['t']:7.1f} {row['reads']:7d} {row['read_p50_ms']:9.2f} {row['read_p99_ms']:9.2f} {row['docs_written_per_s']:10.0f}")
+
+    w = summary["writer"]
+    print(f"\nWriter: {w['docs']} docs in {w['seconds']:.2f}s ({w['docs_per_s']:.0f} docs/s)")
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Main
+# ──────────────────────────────────────────────────────────────────────────────
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay portal reads against Mongo while the seeder writes a new day.")
+    ap.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    ap.add_argument("--db", default="aws_data")
+    ap.add_argument("--region", default="us-east-1")
+    ap.add_argument("--date", default=None, help="YYYY-MM-DD to write; defaults to today (UTC)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--accounts", type=int, default=10, help="Number of AWS accounts the writer generates (default: 10)")
+    ap.add_argument("--account-ids", default=None, help="Comma-separated list of 12-digit AWS account IDs to write instead.")
+    ap.add_argument("--mandatory-tags", default=None, help="Comma-separated mandatory tags for precomputed tag compliance (default: portal defaults)")
+    add_generation_args(ap)
+
+    # Workload
+    ap.add_argument("--readers", type=int, default=4, help="Concurrent reader processes (default: 4)")
+    ap.add_argument("--mix", default="latest=2,scan=3,full=1", help="Weighted reader query shapes (default: latest=2,scan=3,full=1)")
+    ap.add_argument("--warmup", type=float, default=5.0, help="Seconds of reads before the writer starts (default: 5)")
+    ap.add_argument("--cooldown", type=float, default=5.0, help="Seconds of reads after the writer finishes (default: 5)")
+    ap.add_argument("--batch-size", type=int, default=1000, help="Documents per insert_many (default: 1000)")
+    ap.add_argument("--write-concern", default="1", help="Write concern w: 0, 1, N or majority (default: 1)")
+    ap.add_argument("--journal", action="store_true", help="Request journaled writes (j=true)")
+    ap.add_argument("--skip-indexes", action="store_true", help="Don't call ensure_indexes; benchmark whatever index set exists")
+    ap.add_argument("--drop-date", action="store_true", help="Delete existing documents for --date before starting (required if it has any)")
+    ap.add_argument("--reader-timeout", type=float, default=30.0, help="Seconds to wait for each reader to report after stopping (default: 30)")
+    ap.add_argument("--interval", type=float, default=1.0, help="Timeline bucket width in seconds (default: 1)")
+    ap.add_argument("--json-out", default=None, help="Write the summary as JSON to this path")
+
+    args = ap.parse_args()
+    parse_mix(args.mix)
+
+    if args.date:
+        y, m, d = map(int, args.date.split("-"))
+        date = dt.date(y, m, d)
+    else:
+        date = dt.datetime.now(timezone.utc).date()
+
+    query = {"year": date.year, "month": date.month, "day": date.day}
+    client = MongoClient(args.mongo_uri)
+    db = client[args.db]
+    existing = [c for c in db.list_collection_names() if db[c].find_one(query, projection={"_id": 1})]
+    if existing and not args.drop_date:
+        ap.error(f"{date.isoformat()} already has documents in: {', '.join(sorted(existing))}; pass --drop-date to replace them")
+    for coll_name in existing:
+        db[coll_name].delete_many(query)
+    # Close before starting readers (fork safety); reopened for the writer below
+    client.close()
+
+    t0 = time.time()
+    stop = mp.Event()
+    out_q = mp.Queue()
+    procs = [mp.Process(target=reader, args=(i, args, t0, stop, out_q), daemon=True) for i in range(args.readers)]
+    for p in procs:
+        p.start()
+
+    client = MongoClient(args.mongo_uri)
+    db = client[args.db]
+    try:
+        print(f"Warmup: {args.warmup:.1f}s with {args.readers} reader(s)")
+        time.sleep(args.warmup)
+
+        write_start = time.time() - t0
+        print(f"Writing {date.isoformat()} (batch={args.batch_size}, w={args.write_concern}, j={args.journal})")
+        events = run_writer(db, args, date, t0)
+        write_end = time.time() - t0
+
+        print(f"Cooldown: {args.cooldown:.1f}s")
+        time.sleep(args.cooldown)
+    finally:
+        # Always stop and reap the readers, or a writer error leaves them running
+        stop.set()
+        samples = collect_samples(procs, out_q, args.reader_timeout)
+
+    summary = summarise(samples, events, write_start, write_end, args.interval)
+    summary["config"] = {
+        "date": date.isoformat(), "readers": args.readers, "mix": args.mix,
+        "batch_size": args.batch_size, "write_concern": args.write_concern,
+        "journal": args.journal, "skip_indexes": args.skip_indexes,
+    }
+    print_summary(summary)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Wrote summary → {args.json_out}")
+
+    print("✔ Workload simulation complete.")
+
+if __name__ == "__main__":
+    main()